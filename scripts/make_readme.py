@@ -1,78 +1,101 @@
-from __future__ import unicode_literals
-
-import io
+from pathlib import Path
 import re
 import subprocess
+import sys
 import typing
 
 README_FILE = "README.md"
 EXAMPLE_FILE = "src/redd_harvest/data/example.yml"
 EXE = "redd-harvest"
-HELP = "--help"
-
-
-def get_help_text(cmd: typing.List[str]):
-    result = subprocess.run(cmd, stdout=subprocess.PIPE)
+SENTINEL = "\x1e"
+CMD_RE = re.compile(r"^(\w+)\s")
+
+# renders help for the cli group and all of its commands in one interpreter,
+# each command's help preceded by a sentinel line naming the command
+HELP_BOOTSTRAP = f"""
+import click
+from redd_harvest.harvest import main
+
+with click.Context(main, info_name="{EXE}") as ctx:
+    print(main.get_help(ctx))
+    for name in main.list_commands(ctx):
+        cmd = main.get_command(ctx, name)
+        print("{SENTINEL}CMD:" + name + "{SENTINEL}")
+        with click.Context(cmd, info_name=name, parent=ctx) as sub:
+            print(cmd.get_help(sub))
+"""
+
+
+def get_help_texts() -> typing.Tuple[str, typing.Dict[str, str]]:
+    """Get help text for the cli group and each of its commands from a single
+    subprocess, rather than paying interpreter startup per command.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", HELP_BOOTSTRAP], stdout=subprocess.PIPE, check=True
+    )
     text = result.stdout.decode("utf-8")
-    return text.strip()
+    sections = re.split(rf"^{SENTINEL}CMD:(\S+){SENTINEL}$", text, flags=re.M)
+    group_text = sections[0].strip()
+    cmd_texts = {
+        name: cmd_text.strip() for name, cmd_text in zip(sections[1::2], sections[2::2])
+    }
+    return group_text, cmd_texts
 
 
 def get_text_after(text: str, string: str):
     return text[text.index(string) + len(string) + 1 :]
 
 
-def build_options_section(exe: str, flag: str) -> str:
-    helptext = get_help_text([exe, flag])
+def build_options_section() -> str:
+    helptext, cmd_texts = get_help_texts()
     helptext = get_text_after(helptext, "Options:")
     commandtext = get_text_after(helptext, "Commands:")
     commands = []
     for cmd in commandtext.splitlines():
-        matched = re.search(r"^(\w+)\s", cmd.strip())
+        matched = CMD_RE.match(cmd.lstrip())
         if matched:
             commands.append(matched.group(1).strip())
     helptext = f"Global Options:\n{helptext}"
     for cmd in commands:
-        text = get_help_text([exe, cmd, flag])
-        cmd_opt_text = get_text_after(text, "Options:")
+        cmd_opt_text = get_text_after(cmd_texts[cmd], "Options:")
         helptext = f"{helptext}\n\nOptions for '{cmd}':\n{cmd_opt_text}"
     return helptext
 
 
-options_text = build_options_section(EXE, HELP)
-
-with io.open(EXAMPLE_FILE, encoding="utf-8") as f:
-    exampletext = f.read()
-
-if isinstance(exampletext, bytes):
-    exampletext = exampletext.decode("utf-8")
+options_text = build_options_section()
 
-with io.open(README_FILE, encoding="utf-8") as f:
-    oldreadme = f.read()
+exampletext = Path(EXAMPLE_FILE).read_bytes().decode("utf-8")
+oldreadme = Path(README_FILE).read_bytes().decode("utf-8")
 
 option_header_anchor = "# Options"
 option_footer_anchor = "# Configuration"
 example_header_anchor = "## Config File Structure"
 example_footer_anchor = "# Behavior"
 
-option_header = oldreadme[: oldreadme.index(option_header_anchor)]
-option_footer = oldreadme[
-    oldreadme.index(option_footer_anchor) : oldreadme.index(example_header_anchor)
-]
+# anchors appear in order, so each search resumes where the previous matched
+i_opt = oldreadme.index(option_header_anchor)
+i_cfg = oldreadme.index(option_footer_anchor, i_opt)
+i_ex = oldreadme.index(example_header_anchor, i_cfg)
+i_bhv = oldreadme.index(example_footer_anchor, i_ex)
 
-example_header = oldreadme[
-    oldreadme.index(example_header_anchor) : oldreadme.index(example_header_anchor)
-    + len(example_header_anchor)
-    + 1
-]
-example_footer = oldreadme[oldreadme.index(example_footer_anchor) :]
+option_header = oldreadme[:i_opt]
+option_footer = oldreadme[i_cfg:i_ex]
+example_header = oldreadme[i_ex : i_ex + len(example_header_anchor) + 1]
+example_footer = oldreadme[i_bhv:]
 
 options = f"{option_header_anchor}\n```\n{options_text}\n```\n\n"
 exampletext = f"```yaml\n{exampletext}\n```\n\n"
 
-with io.open(README_FILE, "w", encoding="utf-8") as f:
-    f.write(option_header)
-    f.write(options)
-    f.write(option_footer)
-    f.write(example_header)
-    f.write(exampletext)
-    f.write(example_footer)
+Path(README_FILE).write_text(
+    "".join(
+        [
+            option_header,
+            options,
+            option_footer,
+            example_header,
+            exampletext,
+            example_footer,
+        ]
+    ),
+    encoding="utf-8",
+)
@@ -1,5 +1,12 @@
 import abc
+from concurrent.futures import ThreadPoolExecutor
+import copy
+from dataclasses import dataclass, field, fields
+import functools
+import itertools
+import logging
 import os
+import re
 import shutil
 import stat
 from string import Template
@@ -10,6 +17,14 @@ import yaml
 
 from redd_harvest.post import Post
 
+logger = logging.getLogger(__name__)
+
+# prefer the libyaml-backed loader when the bindings are available
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 # global config defaults
 DEFAULT_REDD_HARVEST_APP = "redd-harvest"
 DEFAULT_REDD_HARVEST_USERNAME = "unknown"
@@ -17,6 +32,8 @@ DEFAULT_POST_LIMIT = 5
 DEFAULT_RATE_LIMIT_MAX_WAIT = 120
 DEFAULT_BACKOFF_SLEEP = 0.1
 DEFAULT_DOWNLOAD_FOLDER = os.sep.join(["~", ".redd-harvest", "data"])
+DEFAULT_POST_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+DEFAULT_VALIDITY_TTL = 0
 
 FAVOR_REDDITOR = "redditor"
 FAVOR_SUBREDDIT = "subreddit"
@@ -53,6 +70,13 @@ STORE_TYPE_FLAT = "flat"
 STORE_TYPE_REALLY_FLAT = "really-flat"
 STORE_TYPES = [STORE_TYPE_NESTED, STORE_TYPE_FLAT, STORE_TYPE_REALLY_FLAT]
 
+# set forms of the above for membership checks while loading config
+_FAVOR_SET = frozenset(ALL_FAVOR_SETTINGS)
+_SORT_SET = frozenset(ALL_SORT_TYPES)
+_REDDITOR_SORT_SET = frozenset(REDDITOR_SORT_TYPES)
+_SORT_TOGGLE_SET = frozenset(SORT_TOGGLES)
+_STORE_SET = frozenset(STORE_TYPES)
+
 # template for redditor metadata
 REDDITOR_PRINT_TEMPLATE = (
     "--------------------\n"
@@ -73,105 +97,198 @@ SUBREDDIT_PRINT_TEMPLATE = (
     "  description: $description\n"
 )
 
+# compiled once rather than per validated entity
+_REDDITOR_TEMPLATE = Template(REDDITOR_PRINT_TEMPLATE)
+_SUBREDDIT_TEMPLATE = Template(SUBREDDIT_PRINT_TEMPLATE)
+
+
+@functools.lru_cache(maxsize=32)
+def _expand_user(raw: str) -> str:
+    """Memoized os.path.expanduser."""
+    return os.path.expanduser(raw)
+
+
+def _resolve_folder(raw: str) -> str:
+    """Absolute, user-expanded form of a configured path."""
+    return os.path.abspath(_expand_user(raw))
+
+
+class _SlottedYAMLObject(yaml.YAMLObject):
+    """A YAMLObject that keeps its fields in __slots__ rather than a per-instance
+    __dict__; (de)serialization goes through explicit state methods.
+    """
+
+    __slots__ = ()
+
+    def __getstate__(self) -> typing.Dict[str, typing.Any]:
+        # fields derived at runtime (neither passed in nor shown) are not state
+        derived = {f.name for f in fields(self) if not f.init and not f.repr}
+        return {
+            name: getattr(self, name)
+            for cls in type(self).__mro__
+            for name in getattr(cls, "__slots__", ())
+            if name not in derived and hasattr(self, name)
+        }
+
+    def __setstate__(self, state: typing.Dict[str, typing.Any]):
+        for name, value in state.items():
+            setattr(self, name, value)
 
-class Globals(yaml.YAMLObject):
+    @classmethod
+    def _init_kwargs(
+        cls, conf: typing.Dict[str, typing.Any]
+    ) -> typing.Dict[str, typing.Any]:
+        """Select the entries of a config mapping that are constructor
+        arguments; unrecognized keys are tolerated and dropped.
+        """
+        names = {f.name for f in fields(cls) if f.init}
+        return {k: v for k, v in conf.items() if k in names}
+
+    @classmethod
+    def from_conf(cls, **conf):
+        """Build from a config mapping."""
+        return cls(**cls._init_kwargs(conf))
+
+
+@dataclass(slots=True, eq=False)
+class Globals(_SlottedYAMLObject):
     yaml_tag = "!global"
 
-    def __init__(self, **conf):
-        self.app: str = conf.get("app", DEFAULT_REDD_HARVEST_APP)
-        self.username: str = conf.get("username", DEFAULT_REDD_HARVEST_USERNAME)
-        self.password: str = conf.get("password", "")
-        self.client_id: str = conf.get("client_id", "")
-        self.client_secret: str = conf.get("client_secret", "")
-        self.post_limit: int = conf.get("post_limit", DEFAULT_POST_LIMIT)
-        self.rate_limit_max_wait: int = conf.get(
-            "rate_limit_max_wait", DEFAULT_RATE_LIMIT_MAX_WAIT
-        )
-        self.backoff_sleep: float = conf.get("backoff_sleep", DEFAULT_BACKOFF_SLEEP)
-        self.download_folder: str = os.path.abspath(
-            os.path.expanduser(conf.get("download_folder", DEFAULT_DOWNLOAD_FOLDER))
-        )
-        self.separate_media: bool = conf.get("separate_media", True)
-        self.bonk: bool = conf.get("bonk", False)
+    app: str = DEFAULT_REDD_HARVEST_APP
+    username: str = DEFAULT_REDD_HARVEST_USERNAME
+    password: str = field(default="", repr=False)
+    client_id: str = ""
+    client_secret: str = field(default="", repr=False)
+    post_limit: int = DEFAULT_POST_LIMIT
+    rate_limit_max_wait: int = DEFAULT_RATE_LIMIT_MAX_WAIT
+    backoff_sleep: float = DEFAULT_BACKOFF_SLEEP
+    download_folder: str = DEFAULT_DOWNLOAD_FOLDER
+    separate_media: bool = True
+    bonk: bool = False
+    prune_ignorables: bool = False
+    favor_entity: str = FAVOR_REDDITOR
+    post_workers: int = DEFAULT_POST_WORKERS
+    validity_ttl: float = DEFAULT_VALIDITY_TTL
+
+    def __post_init__(self):
+        self.download_folder = _resolve_folder(self.download_folder)
+        if not isinstance(self.post_workers, int) or self.post_workers < 1:
+            self.post_workers = DEFAULT_POST_WORKERS
+        if not isinstance(self.validity_ttl, (int, float)) or self.validity_ttl < 0:
+            self.validity_ttl = DEFAULT_VALIDITY_TTL
         if not isinstance(self.bonk, bool):
             self.bonk = False
-        self.prune_ignorables: bool = conf.get("prune_ignorables", False)
         if not isinstance(self.prune_ignorables, bool):
             self.prune_ignorables = False
-        self.favor_entity: str = conf.get("favor_entity", FAVOR_REDDITOR).lower()
-        if self.favor_entity not in ALL_FAVOR_SETTINGS:
+        self.favor_entity = self.favor_entity.lower()
+        if self.favor_entity not in _FAVOR_SET:
             self.favor_entity = FAVOR_REDDITOR  # default to redditor
 
 
-class SubSearch(yaml.YAMLObject):
+@functools.lru_cache(maxsize=256)
+def _compile_or_none(regex_str: str) -> typing.Optional[typing.Pattern[str]]:
+    """Compile the given regex, sharing patterns repeated across links; None
+    if it fails to compile.
+    """
+    try:
+        return re.compile(regex_str)
+    except re.error:
+        return None
+
+
+@dataclass(slots=True, eq=False)
+class SubSearch(_SlottedYAMLObject):
     yaml_tag = "!sub_search"
 
-    def __init__(self, **conf):
-        self.page_search_regex: str = conf.get("page_search_regex", None)
-        self.extension: str = conf.get("extension", None)
+    page_search_regex: typing.Optional[str] = None
+    extension: typing.Optional[str] = None
+    # compiled at load; None when the configured value is missing or invalid
+    page_search_pattern: typing.Optional[typing.Pattern[str]] = field(
+        default=None, init=False, repr=False
+    )
+    # lowercased once at load for case-insensitive url checks
+    lower_extension: typing.Optional[str] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.page_search_regex is not None:
+            self.page_search_pattern = _compile_or_none(self.page_search_regex)
+        if self.extension is not None:
+            self.lower_extension = self.extension.lower()
 
 
-class Link(yaml.YAMLObject):
+@dataclass(slots=True, eq=False)
+class Link(_SlottedYAMLObject):
     yaml_tag = "!link"
 
-    def __init__(self, **conf):
-        self.base_url: str = conf.get("base_url", None)
-        self.direct_dl_url_extensions: typing.List[str] = conf.get(
-            "direct_dl_url_extensions", []
-        )
-        searches: typing.List[typing.Dict[str, str]] = conf.get("sub_searches", [])
-        # redundant since we've initialized this above?
-        self.sub_searches: typing.List[SubSearch] = []
-        for search in searches:
-            s = SubSearch(**search)
-            if s.page_search_regex is not None:
-                self.sub_searches.append(s)  # only load qualifying sub_searches
+    base_url: typing.Optional[str] = None
+    direct_dl_url_extensions: typing.List[str] = field(default_factory=list)
+    sub_searches: typing.List[SubSearch] = field(default_factory=list)
+    # lowercased once at load for case-insensitive url checks
+    lower_base_url: typing.Optional[str] = field(default=None, init=False, repr=False)
+    lower_extensions: typing.List[str] = field(
+        default_factory=list, init=False, repr=False
+    )
 
+    def __post_init__(self):
+        if self.base_url is not None:
+            self.lower_base_url = self.base_url.lower()
+        self.lower_extensions = [ext.lower() for ext in self.direct_dl_url_extensions]
 
-class SearchCriteria(yaml.YAMLObject):
+    @classmethod
+    def from_conf(cls, **conf) -> "Link":
+        searches = [SubSearch.from_conf(**ss) for ss in conf.get("sub_searches") or []]
+        # only load qualifying sub_searches
+        conf = {
+            **conf,
+            "sub_searches": [s for s in searches if s.page_search_regex is not None],
+        }
+        return cls(**cls._init_kwargs(conf))
+
+
+@dataclass(slots=True, eq=False)
+class SearchCriteria(_SlottedYAMLObject):
     yaml_tag = "!search_criteria"
 
-    def __init__(self, default_post_limit=DEFAULT_POST_LIMIT, **conf):
-        self.post_limit: int = conf.get("post_limit", default_post_limit)
-        self.sort_type: str = conf.get("sort_type", NEW).lower()
-        if self.sort_type not in ALL_SORT_TYPES:
+    post_limit: int = DEFAULT_POST_LIMIT
+    sort_type: str = NEW
+    sort_toggle: typing.Optional[str] = None
+
+    def __post_init__(self):
+        self.sort_type = self.sort_type.lower()
+        if self.sort_type not in _SORT_SET:
             self.sort_type = NEW  # default to new if unsupported
-        if self.sort_type in [TOP, CONTROVERSIAL]:
-            self.sort_toggle: str = conf.get("sort_toggle", WEEK).lower()
-            if self.sort_toggle not in SORT_TOGGLES:
+        if self.sort_type in (TOP, CONTROVERSIAL):
+            if self.sort_toggle is None:
+                self.sort_toggle = WEEK
+            self.sort_toggle = self.sort_toggle.lower()
+            if self.sort_toggle not in _SORT_TOGGLE_SET:
                 self.sort_toggle = WEEK  # default to week if unsupported
-        else:
-            self.sort_toggle = conf.get("sort_toggle", None)
+
+
+def _entity_download_folder(
+    store_type: str,
+    is_redditor: bool,
+    alias: str,
+    post_author: str,
+    post_subreddit_name: str,
+) -> str:
+    """Download folder for a post from an entity with the given store type and
+    alias; results are cached per config by get_download_sub_folder.
+    """
+    if store_type == STORE_TYPE_NESTED:
+        # <redditor>/<subreddit> for redditors, <subreddit>/<redditor> for
+        # subreddits
+        return os.path.join(alias, post_subreddit_name if is_redditor else post_author)
+    elif store_type == STORE_TYPE_FLAT:
+        return alias
+    # STORE_TYPE_REALLY_FLAT
+    return "."
 
 
 class EntityInterface(metaclass=abc.ABCMeta):
     """Interface for interacting with redditors and subreddits"""
 
-    @classmethod
-    def __subclasshook__(cls, subclass):
-        return (
-            hasattr(subclass, "is_redditor")
-            and callable(subclass.is_redditor)
-            and hasattr(subclass, "is_subreddit")
-            and callable(subclass.is_subreddit)
-            or hasattr(subclass, "get_name")
-            and callable(subclass.get_name)
-            or hasattr(subclass, "get_alias")
-            and callable(subclass.get_alias)
-            or hasattr(subclass, "get_store_type")
-            and callable(subclass.get_store_type)
-            or hasattr(subclass, "get_search_criteria")
-            and callable(subclass.get_search_criteria)
-            or hasattr(subclass, "validate")
-            and callable(subclass.validate)
-            or hasattr(subclass, "is_valid")
-            and callable(subclass.is_valid)
-            or hasattr(subclass, "get_submissions")
-            and callable(subclass.get_submissions)
-            or hasattr(subclass, "get_download_folder")
-            and callable(subclass.get_download_folder)
-            or NotImplemented
-        )
+    __slots__ = ()
 
     @abc.abstractmethod
     def is_redditor(self) -> bool:
@@ -224,38 +341,73 @@ class EntityInterface(metaclass=abc.ABCMeta):
         """Determine the intended download folder based on the provided post
         author and name of the subreddit where it was posted.
         """
-        if self.get_store_type() == STORE_TYPE_FLAT:
-            return self.get_alias()
-        elif self.is_redditor() and self.get_store_type() == STORE_TYPE_FLAT:
-            return os.sep.join([self.get_alias(), post_subreddit_name])
-        elif self.is_subreddit() and self.get_store_type() == STORE_TYPE_FLAT:
-            return os.sep.join([self.get_alias(), post_author])
-        # STORE_TYPE_REALLY_FLAT
-        return "."
+        return _entity_download_folder(
+            self.get_store_type(),
+            self.is_redditor(),
+            self.get_alias(),
+            post_author,
+            post_subreddit_name,
+        )
 
+    def _proxy(self, reddit: praw.Reddit):
+        """The praw model for the entity; reused across calls so that data
+        fetched while validating is not requested again.
+        """
+        proxy = getattr(self, "_praw_proxy", None)
+        if proxy is None:
+            if self.is_redditor():
+                proxy = reddit.redditor(self.get_name())
+            else:
+                proxy = reddit.subreddit(self.get_name())
+            self._praw_proxy = proxy
+        return proxy
 
-class EntityMeta(type(yaml.YAMLObject), type(EntityInterface)):
+
+class EntityMeta(type(_SlottedYAMLObject), type(EntityInterface)):
     pass
 
 
-class Redditor(yaml.YAMLObject, EntityInterface, metaclass=EntityMeta):
+@dataclass(slots=True, eq=False)
+class Redditor(_SlottedYAMLObject, EntityInterface, metaclass=EntityMeta):
     yaml_tag = "!redditor"
 
-    def __init__(self, default_post_limit=DEFAULT_POST_LIMIT, **conf):
-        self.name: str = conf.get("name", None)
-        self.alias: str = conf.get("alias", self.name)
-        # redditors default to flat when not specified
-        self.store_type: str = conf.get("store_type", STORE_TYPE_FLAT)
-        if self.store_type not in STORE_TYPES:
+    # sort type -> submissions listing; unsupported sort types use new
+    _SUBMISSION_DISPATCH = {
+        NEW: lambda r, sc: r.submissions.new(limit=sc.post_limit),
+        HOT: lambda r, sc: r.submissions.hot(limit=sc.post_limit),
+        TOP: lambda r, sc: r.submissions.top(sc.sort_toggle, limit=sc.post_limit),
+        CONTROVERSIAL: lambda r, sc: r.submissions.controversial(
+            sc.sort_toggle, limit=sc.post_limit
+        ),
+        STREAM: lambda r, sc: r.stream.submissions(),
+    }
+
+    name: typing.Optional[str] = None
+    alias: typing.Optional[str] = None
+    # redditors default to flat when not specified
+    store_type: str = STORE_TYPE_FLAT
+    search_criteria: SearchCriteria = field(default_factory=SearchCriteria)
+    valid: bool = field(default=False, init=False)
+    _praw_proxy: typing.Any = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.name is not None:
+            self.name = self.name.strip()
+        if self.alias is None:
+            self.alias = self.name
+        if self.store_type not in _STORE_SET:
             # default to flat if unsupported
             self.store_type = STORE_TYPE_FLAT
-        sc = conf.get("search_criteria", {})
-        self.search_criteria: SearchCriteria = SearchCriteria(default_post_limit, **sc)
-        if self.search_criteria.sort_type not in REDDITOR_SORT_TYPES:
+        if self.search_criteria.sort_type not in _REDDITOR_SORT_SET:
             # not all sort types supported for redditors; default to new if
             # unsupported
             self.search_criteria.sort_type = NEW
-        self.valid: bool = False
+
+    @classmethod
+    def from_conf(cls, default_post_limit=DEFAULT_POST_LIMIT, **conf) -> "Redditor":
+        sc = {"post_limit": default_post_limit, **(conf.get("search_criteria") or {})}
+        conf = {**conf, "search_criteria": SearchCriteria.from_conf(**sc)}
+        return cls(**cls._init_kwargs(conf))
 
     def is_redditor(self) -> bool:
         return True
@@ -277,16 +429,16 @@ class Redditor(yaml.YAMLObject, EntityInterface, metaclass=EntityMeta):
 
     def validate(self, reddit: praw.Reddit):
         """Validate the configured Redditor via a query to reddit."""
-        print(f"attempting to get user {self.get_name()}")
-        r = reddit.redditor(self.get_name())
-        rdtr_data = Template(REDDITOR_PRINT_TEMPLATE).substitute(
+        logger.info(f"attempting to get user {self.get_name()}")
+        r = self._proxy(reddit)
+        rdtr_data = _REDDITOR_TEMPLATE.substitute(
             name=r.name.strip(),
             id=r.id.strip(),
             is_mod=r.is_mod,
             is_gold=r.is_gold,
             has_verified_email=r.has_verified_email,
         )
-        print(rdtr_data)
+        logger.info(rdtr_data)
         self.valid = True
 
     def is_valid(self) -> bool:
@@ -297,47 +449,55 @@ class Redditor(yaml.YAMLObject, EntityInterface, metaclass=EntityMeta):
         self, reddit: praw.Reddit
     ) -> typing.List[praw.reddit.models.Submission]:
         """Get submissions for the Redditor based on it's configuration."""
-        print(
-            f"searching submissions from '{self.get_name().strip()}' by {self.search_criteria.sort_type}/{self.search_criteria.sort_toggle}"
+        logger.info(
+            f"searching submissions from '{self.get_name()}' by {self.search_criteria.sort_type}/{self.search_criteria.sort_toggle}"
         )
-        if self.search_criteria.sort_type == NEW:
-            return reddit.redditor(self.get_name()).submissions.new(
-                limit=self.search_criteria.post_limit
-            )
-        elif self.search_criteria.sort_type == HOT:
-            return reddit.redditor(self.get_name()).submissions.hot(
-                limit=self.search_criteria.post_limit
-            )
-        elif self.search_criteria.sort_type == TOP:
-            return reddit.redditor(self.get_name()).submissions.top(
-                self.search_criteria.sort_toggle, limit=self.search_criteria.post_limit
-            )
-        elif self.search_criteria.sort_type == CONTROVERSIAL:
-            return reddit.redditor(self.get_name()).submissions.controversial(
-                self.search_criteria.sort_toggle, limit=self.search_criteria.post_limit
-            )
-        elif self.search_criteria.sort_type == STREAM:
-            return reddit.redditor(self.get_name()).stream.submissions()
-        else:  # default to new
-            return reddit.redditor(self.get_name()).submissions.new(
-                limit=self.search_criteria.post_limit
-            )
+        fetch = self._SUBMISSION_DISPATCH.get(
+            self.search_criteria.sort_type, self._SUBMISSION_DISPATCH[NEW]
+        )
+        return fetch(self._proxy(reddit), self.search_criteria)
 
 
-class Subreddit(yaml.YAMLObject, EntityInterface, metaclass=EntityMeta):
+@dataclass(slots=True, eq=False)
+class Subreddit(_SlottedYAMLObject, EntityInterface, metaclass=EntityMeta):
     yaml_tag = "!subreddit"
 
-    def __init__(self, default_post_limit=DEFAULT_POST_LIMIT, **conf):
-        self.name: str = conf.get("name", None)
-        self.alias: str = conf.get("alias", self.name)
-        # subreddits default to nested when not specified
-        self.store_type: str = conf.get("store_type", STORE_TYPE_NESTED)
-        if self.store_type not in STORE_TYPES:
+    # sort type -> submissions listing; unsupported sort types use new
+    _SUBMISSION_DISPATCH = {
+        NEW: lambda s, sc: s.new(limit=sc.post_limit),
+        HOT: lambda s, sc: s.hot(limit=sc.post_limit),
+        TOP: lambda s, sc: s.top(sc.sort_toggle, limit=sc.post_limit),
+        CONTROVERSIAL: lambda s, sc: s.controversial(
+            sc.sort_toggle, limit=sc.post_limit
+        ),
+        STREAM: lambda s, sc: s.stream.submissions(),
+        RISING: lambda s, sc: s.rising(limit=sc.post_limit),
+        RANDOM_RISING: lambda s, sc: s.random_rising(limit=sc.post_limit),
+        RANDOM: lambda s, sc: s.random(),
+    }
+
+    name: typing.Optional[str] = None
+    alias: typing.Optional[str] = None
+    # subreddits default to nested when not specified
+    store_type: str = STORE_TYPE_NESTED
+    search_criteria: SearchCriteria = field(default_factory=SearchCriteria)
+    valid: bool = field(default=False, init=False)
+    _praw_proxy: typing.Any = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.name is not None:
+            self.name = self.name.strip()
+        if self.alias is None:
+            self.alias = self.name
+        if self.store_type not in _STORE_SET:
             # default to nested if unsupported
             self.store_type = STORE_TYPE_NESTED
-        sc = conf.get("search_criteria", {})
-        self.search_criteria: SearchCriteria = SearchCriteria(default_post_limit, **sc)
-        self.valid: bool = False
+
+    @classmethod
+    def from_conf(cls, default_post_limit=DEFAULT_POST_LIMIT, **conf) -> "Subreddit":
+        sc = {"post_limit": default_post_limit, **(conf.get("search_criteria") or {})}
+        conf = {**conf, "search_criteria": SearchCriteria.from_conf(**sc)}
+        return cls(**cls._init_kwargs(conf))
 
     def is_redditor(self) -> bool:
         return False
@@ -359,9 +519,9 @@ class Subreddit(yaml.YAMLObject, EntityInterface, metaclass=EntityMeta):
 
     def validate(self, reddit: praw.Reddit):
         """Validate the configured Subreddit via a query to reddit."""
-        print(f"attempting to get subreddit {self.get_name()}")
-        s = reddit.subreddit(self.get_name())
-        subr_data = Template(SUBREDDIT_PRINT_TEMPLATE).substitute(
+        logger.info(f"attempting to get subreddit {self.get_name()}")
+        s = self._proxy(reddit)
+        subr_data = _SUBREDDIT_TEMPLATE.substitute(
             display_name=s.display_name.strip(),
             id=s.id.strip(),
             name=s.name.strip(),
@@ -370,7 +530,7 @@ class Subreddit(yaml.YAMLObject, EntityInterface, metaclass=EntityMeta):
             if len(s.description) > 300
             else s.description,
         )
-        print(subr_data)
+        logger.info(subr_data)
         self.valid = True
 
     def is_valid(self) -> bool:
@@ -381,56 +541,84 @@ class Subreddit(yaml.YAMLObject, EntityInterface, metaclass=EntityMeta):
         self, reddit: praw.Reddit
     ) -> typing.List[praw.reddit.models.Submission]:
         """Get submissions for the Subreddit based on it's configuration."""
-        print(
-            f"searching submissions from '{reddit.subreddit(self.get_name()).display_name.strip()}' by {self.search_criteria.sort_type}/{self.search_criteria.sort_toggle}"
+        logger.info(
+            f"searching submissions from '{self.get_name()}' by {self.search_criteria.sort_type}/{self.search_criteria.sort_toggle}"
         )
-        if self.search_criteria.sort_type == NEW:
-            return reddit.subreddit(self.get_name()).new(
-                limit=self.search_criteria.post_limit
-            )
-        elif self.search_criteria.sort_type == HOT:
-            return reddit.subreddit(self.get_name()).hot(
-                limit=self.search_criteria.post_limit
-            )
-        elif self.search_criteria.sort_type == TOP:
-            return reddit.subreddit(self.get_name()).top(
-                self.search_criteria.sort_toggle, limit=self.search_criteria.post_limit
-            )
-        elif self.search_criteria.sort_type == CONTROVERSIAL:
-            return reddit.subreddit(self.get_name()).controversial(
-                self.search_criteria.sort_toggle, limit=self.search_criteria.post_limit
-            )
-        elif self.search_criteria.sort_type == STREAM:
-            return reddit.subreddit(self.get_name()).stream.submissions()
-        elif self.search_criteria.sort_type == RISING:
-            return reddit.subreddit(self.get_name()).rising(
-                limit=self.search_criteria.post_limit
-            )
-        elif self.search_criteria.sort_type == RANDOM_RISING:
-            return reddit.subreddit(self.get_name()).random_rising(
-                limit=self.search_criteria.post_limit
-            )
-        elif self.search_criteria.sort_type == RANDOM:
-            return reddit.subreddit(self.get_name()).random()
-        else:  # default to new
-            return reddit.subreddit(self.get_name()).new(
-                limit=self.search_criteria.post_limit
-            )
+        fetch = self._SUBMISSION_DISPATCH.get(
+            self.search_criteria.sort_type, self._SUBMISSION_DISPATCH[NEW]
+        )
+        return fetch(self._proxy(reddit), self.search_criteria)
         # TODO: possibly handle 'front'?
 
 
-class IgnoredUser(yaml.YAMLObject):
+@dataclass(slots=True, eq=False)
+class IgnoredUser(_SlottedYAMLObject):
     yaml_tag = "!ignored_redditor"
 
-    def __init__(self, **conf):
-        self.name: str = conf.get("name", None)
+    name: typing.Optional[str] = None
+
+    def __post_init__(self):
+        if self.name is not None:
+            self.name = self.name.strip()
 
 
-class IgnoredSubreddit(yaml.YAMLObject):
+@dataclass(slots=True, eq=False)
+class IgnoredSubreddit(_SlottedYAMLObject):
     yaml_tag = "!ignored_subreddit"
 
-    def __init__(self, **conf):
-        self.name: str = conf.get("name", None)
+    name: typing.Optional[str] = None
+
+    def __post_init__(self):
+        if self.name is not None:
+            self.name = self.name.strip()
+
+
+# path resolvers for yaml's default loaders; registered once at import
+yaml.add_path_resolver("!global", ["globals"], dict)
+yaml.add_path_resolver("!redditor", ["redditors"], list)
+yaml.add_path_resolver("!subreddit", ["subreddits"], list)
+yaml.add_path_resolver("!ignored_redditor", ["ignored_redditors"], list)
+yaml.add_path_resolver("!ignored_subreddit", ["ignored_subreddits"], list)
+yaml.add_path_resolver("!link", ["links"], list)
+
+
+def _matching_subfolders(parent: str, names: typing.Set[str]) -> typing.List[str]:
+    """List the sub-folders of parent whose names are in names."""
+    try:
+        with os.scandir(parent) as entries:
+            return [
+                entry.path
+                for entry in entries
+                if entry.name in names and entry.is_dir(follow_symlinks=False)
+            ]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+class LinkIndex:
+    """Links bucketed by the leading characters of their base url, so that a
+    url is only prefix-checked against links that could possibly match it;
+    configured order is preserved within each bucket.
+    """
+
+    def __init__(self, links: typing.List[Link]):
+        usable = [ln for ln in links if ln.lower_base_url is not None]
+        # every usable base url is at least this long, so any base url that is
+        # a prefix of a url shares that url's first key_len characters
+        self.key_len: int = min((len(ln.lower_base_url) for ln in usable), default=0)
+        self.buckets: typing.Dict[str, typing.List[Link]] = {}
+        for ln in usable:
+            self.buckets.setdefault(ln.lower_base_url[: self.key_len], []).append(ln)
+
+    def candidates(self, lower_url: str) -> typing.List[Link]:
+        """Links, in configured order, whose base url prefixes the given
+        lowercased url.
+        """
+        return [
+            ln
+            for ln in self.buckets.get(lower_url[: self.key_len], [])
+            if lower_url.startswith(ln.lower_base_url)
+        ]
 
 
 class ReddHarvestConfig:
@@ -449,43 +637,37 @@ class ReddHarvestConfig:
         self.ignored_redditors: typing.List[IgnoredUser] = ignored_redditors
         self.ignored_subreddits: typing.List[IgnoredSubreddit] = ignored_subreddits
         self.links: typing.List[Link] = links
+        self.link_index: LinkIndex = LinkIndex(links)
+        # precomputed for constant-time ignore checks
+        self._ignored_redditor_names: typing.FrozenSet[str] = frozenset(
+            igr.name for igr in ignored_redditors if igr.name
+        )
+        self._ignored_subreddit_names: typing.FrozenSet[str] = frozenset(
+            igs.name for igs in ignored_subreddits if igs.name
+        )
+        # precomputed for constant-time favor lookups
+        self._redditors_by_name: typing.Dict[str, Redditor] = {
+            rdtr.name: rdtr for rdtr in reversed(redditors)
+        }
+        self._subreddits_by_name: typing.Dict[str, Subreddit] = {
+            sub.name: sub for sub in reversed(subreddits)
+        }
+        # resolved sub folders keyed on (entity, post author, post subreddit)
+        self._folder_cache: typing.Dict[typing.Tuple[int, str, str], str] = {}
 
     def get_entities(self) -> typing.List[EntityInterface]:
         """Get entities to retrieve posts from based on the configuration;
         only entities that are not defined as ignored are returned.
         """
-        entity_list: typing.List[EntityInterface] = []
-
-        # print("---")
-        # print("determining ignorable entities")
-        # print("---")
-        for user in self.redditors:
-            # print(f"- parsing redditor '{user.name}'")
-            ignore = False
-            for igr in self.ignored_redditors:
-                if igr.name.strip() == user.name.strip():
-                    ignore = True
-                    break
-            if ignore:
-                # print("-- ignoring...")
-                continue
-            entity_list.append(user)
-
-        for sub in self.subreddits:
-            # print(f"- parsing subreddit '{sub.name}'")
-            ignore = False
-            for igs in self.ignored_subreddits:
-                if igs.name.strip() == sub.name.strip():
-                    ignore = True
-                    break
-            if ignore:
-                # print("-- ignoring...")
-                continue
-            entity_list.append(sub)
-        # print("---")
-        # print()
-
-        return entity_list
+        return [
+            user
+            for user in self.redditors
+            if user.name not in self._ignored_redditor_names
+        ] + [
+            sub
+            for sub in self.subreddits
+            if sub.name not in self._ignored_subreddit_names
+        ]
 
     def prune_ignorables(self):
         """If we can determine that an ignored redditor posted in a subreddit
@@ -495,156 +677,65 @@ class ReddHarvestConfig:
         attempt to remove just posts from that subreddit from where nested
         posts would be saved.
         """
-        prune = []
-        for igr in self.ignored_redditors:
-            prune.append(os.sep.join([self.globals.download_folder, igr.name.strip()]))
-            prune.append(
-                os.sep.join([self.globals.download_folder, "images", igr.name.strip()])
+        # map each folder that may hold content for ignored entities to the
+        # names of the ignored entities whose folders should be removed from it
+        candidates: typing.Dict[str, typing.Set[str]] = {}
+        root = self.globals.download_folder
+        media_roots = [root] + [
+            os.path.join(root, media) for media in ["images", "videos", "unknown"]
+        ]
+        ignored_names = self._ignored_redditor_names | self._ignored_subreddit_names
+        for media_root in media_roots:
+            candidates.setdefault(media_root, set()).update(ignored_names)
+        for media_root, sub in itertools.product(media_roots, self.subreddits):
+            candidates.setdefault(os.path.join(media_root, sub.name), set()).update(
+                self._ignored_redditor_names
             )
-            prune.append(
-                os.sep.join([self.globals.download_folder, "videos", igr.name.strip()])
+        for media_root, user in itertools.product(media_roots, self.redditors):
+            candidates.setdefault(os.path.join(media_root, user.name), set()).update(
+                self._ignored_subreddit_names
             )
-            prune.append(
-                os.sep.join([self.globals.download_folder, "unknown", igr.name.strip()])
-            )
-            for sub in self.subreddits:
-                prune.append(
-                    os.sep.join(
-                        [
-                            self.globals.download_folder,
-                            sub.name,
-                            igr.name.strip(),
-                        ]
-                    )
-                )
-                prune.append(
-                    os.sep.join(
-                        [
-                            self.globals.download_folder,
-                            "images",
-                            sub.name,
-                            igr.name.strip(),
-                        ]
-                    )
-                )
-                prune.append(
-                    os.sep.join(
-                        [
-                            self.globals.download_folder,
-                            "videos",
-                            sub.name,
-                            igr.name.strip(),
-                        ]
-                    )
-                )
-                prune.append(
-                    os.sep.join(
-                        [
-                            self.globals.download_folder,
-                            "unknown",
-                            sub.name,
-                            igr.name.strip(),
-                        ]
-                    )
-                )
-        for igs in self.ignored_subreddits:
-            prune.append(
-                os.sep.join(
-                    [
-                        self.globals.download_folder,
-                        igs.name.strip(),
-                    ]
+        candidates = {k: v for k, v in candidates.items() if len(v) > 0}
+        if len(candidates) < 1:
+            return
+
+        # list each candidate folder once rather than stat-ing every pairing;
+        # both listing and removal are dominated by blocking syscalls, which
+        # overlap well across threads
+        workers = min(32, (os.cpu_count() or 1) * 4, len(candidates))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            must_delete = list(
+                itertools.chain.from_iterable(
+                    executor.map(_matching_subfolders, candidates, candidates.values())
                 )
             )
-            prune.append(
-                os.sep.join(
-                    [
-                        self.globals.download_folder,
-                        "images",
-                        igs.name.strip(),
-                    ]
-                )
-            )
-            prune.append(
-                os.sep.join(
-                    [
-                        self.globals.download_folder,
-                        "videos",
-                        igs.name.strip(),
-                    ]
-                )
-            )
-            prune.append(
-                os.sep.join(
-                    [
-                        self.globals.download_folder,
-                        "unknown",
-                        igs.name.strip(),
-                    ]
-                )
-            )
-            for user in self.redditors:
-                prune.append(
-                    os.sep.join(
-                        [
-                            self.globals.download_folder,
-                            user.name,
-                            igs.name.strip(),
-                        ]
-                    )
-                )
-                prune.append(
-                    os.sep.join(
-                        [
-                            self.globals.download_folder,
-                            "images",
-                            user.name,
-                            igs.name.strip(),
-                        ]
-                    )
-                )
-                prune.append(
-                    os.sep.join(
-                        [
-                            self.globals.download_folder,
-                            "videos",
-                            user.name,
-                            igs.name.strip(),
-                        ]
-                    )
-                )
-                prune.append(
-                    os.sep.join(
-                        [
-                            self.globals.download_folder,
-                            "unknown",
-                            user.name,
-                            igs.name.strip(),
-                        ]
-                    )
-                )
-        must_delete = []
-        for p in prune:
-            if os.path.exists(p):
-                must_delete.append(p)
-        if len(must_delete) > 0:
-            print("---")
-            print("pruning detectable content for ignored entities")
-            print("---")
-            for p in must_delete:
-                print(f"--- removing folder: {p}")
-                shutil.rmtree(p)
-            print("---")
-            print()
+        # folders nested within another folder being removed go along with it;
+        # dropping them keeps concurrent removals from racing each other
+        doomed = set(must_delete)
+        victims: typing.List[str] = []
+        for p in sorted(doomed):
+            parent = os.path.dirname(p)
+            while parent not in doomed and parent != os.path.dirname(parent):
+                parent = os.path.dirname(parent)
+            if parent not in doomed:
+                victims.append(p)
+        if len(victims) > 0:
+            logger.info("---")
+            logger.info("pruning detectable content for ignored entities")
+            logger.info("---")
+            for p in victims:
+                logger.info(f"--- removing folder: {p}")
+            workers = min(32, (os.cpu_count() or 1) * 4, len(victims))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(shutil.rmtree, victims))
+            logger.info("---")
+            logger.info("")
 
     def should_ignore_post(self, post: Post) -> bool:
-        for igr in self.ignored_redditors:
-            if igr.name == post.author:
-                return True
-        for igs in self.ignored_subreddits:
-            if igs.name == post.subreddit_name:
-                return True
-        return False
+        return (
+            post.author in self._ignored_redditor_names
+            or post.subreddit_name in self._ignored_subreddit_names
+        )
 
     def separate_media(self) -> bool:
         return self.globals.separate_media
@@ -657,95 +748,119 @@ class ReddHarvestConfig:
         """For a given entity and post, return the folder that should be used
         to save content from the post.
         """
+        key = (id(entity), post.author, post.subreddit_name)
+        cached = self._folder_cache.get(key)
+        if cached is not None:
+            return cached
         dl_sub_folder = entity.get_download_folder(post.author, post.subreddit_name)
+        favor_entity = self.globals.favor_entity
         # handle specials case favoring if enabled and entity type is opposite
         # of what should be favored
-        if self.globals.favor_entity == FAVOR_REDDITOR and entity.is_subreddit():
-            for rdtr in self.redditors:
-                if post.author == rdtr.name:
-                    dl_sub_folder = rdtr.get_download_folder(
-                        post.author, post.subreddit_name
-                    )
-                    break
-        elif self.globals.favor_entity == FAVOR_SUBREDDIT and entity.is_redditor():
-            for sub in self.subreddits:
-                if post.subreddit_name == sub.name:
-                    dl_sub_folder = sub.get_download_folder(
-                        post.author, post.subreddit_name
-                    )
-                    break
+        if favor_entity == FAVOR_REDDITOR and entity.is_subreddit():
+            rdtr = self._redditors_by_name.get(post.author)
+            if rdtr is not None:
+                dl_sub_folder = rdtr.get_download_folder(
+                    post.author, post.subreddit_name
+                )
+        elif favor_entity == FAVOR_SUBREDDIT and entity.is_redditor():
+            sub = self._subreddits_by_name.get(post.subreddit_name)
+            if sub is not None:
+                dl_sub_folder = sub.get_download_folder(
+                    post.author, post.subreddit_name
+                )
         else:  # else disabled or we can just use as-is
             pass
-        return os.path.normpath(dl_sub_folder)
+        dl_sub_folder = os.path.normpath(dl_sub_folder)
+        self._folder_cache[key] = dl_sub_folder
+        return dl_sub_folder
+
+
+# group and other permission bits; any of these set exposes the config file
+_WORLD_GROUP_MASK = (
+    stat.S_IRGRP
+    | stat.S_IWGRP
+    | stat.S_IXGRP
+    | stat.S_IROTH
+    | stat.S_IWOTH
+    | stat.S_IXOTH
+)
 
 
-def _make_file_private(file: str):
+def _make_file_private(file: str) -> os.stat_result:
+    """Restrict the config file to its owner; returns the file's stat result
+    (mtime and size are unaffected by the chmod).
+    """
     st = os.stat(file)
-    if bool(
-        st.st_mode
-        & sum(
-            [
-                stat.S_IRGRP,
-                stat.S_IWGRP,
-                stat.S_IXGRP,
-                stat.S_IROTH,
-                stat.S_IWOTH,
-                stat.S_IXOTH,
-            ]
+    if st.st_mode & _WORLD_GROUP_MASK:
+        logger.info(
+            f"making config file {file} private as it contains sensitive information"
         )
-    ):
-        print(f"making config file {file} private as it contains sensitive information")
         os.chmod(file, 0o600)
+    return st
+
+
+def _load_yaml(stream: typing.IO) -> typing.Dict[str, typing.Any]:
+    """Parse the given config stream into plain python data."""
+    return yaml.load(stream, Loader=_SafeLoader)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_yaml_cached(
+    path: str, mtime_ns: int, size: int
+) -> typing.Dict[str, typing.Any]:
+    """Parse the config file at the given path; modification time and size are
+    part of the cache key so that edits to the file invalidate it.
+    """
+    with open(path, "r") as c:
+        return _load_yaml(c)
 
 
 def gather_config(config_file: str) -> ReddHarvestConfig:
     """Gather configuration from the specified file."""
     config_data = {}
-    file = os.path.abspath(os.path.expanduser(config_file))
-    _make_file_private(file)
-    with open(file, "r") as c:
-        yaml.add_path_resolver("!global", ["globals"], dict)
-        yaml.add_path_resolver("!redditor", ["redditors"], list)
-        yaml.add_path_resolver("!subreddit", ["subreddits"], list)
-        yaml.add_path_resolver("!ignored_redditor", ["ignored_redditors"], list)
-        yaml.add_path_resolver("!ignored_subreddit", ["ignored_subreddits"], list)
-        yaml.add_path_resolver("!link", ["links"], list)
-        config_data = yaml.safe_load(c)
-
-    # print("---")
-    # print("resolved configuration")
-    # print("---")
-    global_config = Globals(**config_data["globals"])
-    # print(yaml.dump(global_config))
-    redditors: typing.List[Redditor] = []
-    for r in config_data.get("redditors", []):
-        redditor = Redditor(global_config.post_limit, **r)
-        redditors.append(redditor)
-    # print(yaml.dump(redditors))
-    subreddits: typing.List[Subreddit] = []
-    for s in config_data.get("subreddits", []):
-        subreddit = Subreddit(global_config.post_limit, **s)
-        subreddits.append(subreddit)
-    # print(yaml.dump(subreddits))
-    ignored_redditors: typing.List[IgnoredUser] = []
-    if config_data["ignored_redditors"] is not None:
-        for igr in config_data.get("ignored_redditors", []):
-            ignored_redditor = IgnoredUser(**igr)
-            ignored_redditors.append(ignored_redditor)
-    # print(yaml.dump(ignored_redditors))
-    ignored_subreddits: typing.List[IgnoredSubreddit] = []
-    if config_data["ignored_subreddits"] is not None:
-        for igs in config_data.get("ignored_subreddits", []):
-            ignored_subreddit = IgnoredSubreddit(**igs)
-            ignored_subreddits.append(ignored_subreddit)
-    # print(yaml.dump(ignored_subreddits))
-    links: typing.List[Link] = []
-    for ln in config_data["links"]:
-        link = Link(**ln)
-        links.append(link)
-    # print(yaml.dump(links))
-    # print("---")
-    # print()
+    file = _resolve_folder(config_file)
+    st = _make_file_private(file)
+    # copied so callers can't mutate the cached parse
+    config_data = copy.deepcopy(_load_yaml_cached(file, st.st_mtime_ns, st.st_size))
+
+    # dumps are only rendered when debug logging is enabled
+    debug = logger.isEnabledFor(logging.DEBUG)
+    global_config = Globals.from_conf(**config_data["globals"])
+    if debug:
+        state = global_config.__getstate__()
+        for secret in ["password", "client_secret"]:
+            if state.get(secret):
+                state[secret] = "<redacted>"
+        logger.debug("resolved globals:\n%s", yaml.dump(state))
+    redditors: typing.List[Redditor] = [
+        Redditor.from_conf(global_config.post_limit, **r)
+        for r in (config_data.get("redditors") or [])
+    ]
+    if debug:
+        logger.debug("resolved redditors:\n%s", yaml.dump(redditors))
+    subreddits: typing.List[Subreddit] = [
+        Subreddit.from_conf(global_config.post_limit, **s)
+        for s in (config_data.get("subreddits") or [])
+    ]
+    if debug:
+        logger.debug("resolved subreddits:\n%s", yaml.dump(subreddits))
+    ignored_redditors: typing.List[IgnoredUser] = [
+        IgnoredUser.from_conf(**igr)
+        for igr in (config_data.get("ignored_redditors") or [])
+    ]
+    if debug:
+        logger.debug("resolved ignored redditors:\n%s", yaml.dump(ignored_redditors))
+    ignored_subreddits: typing.List[IgnoredSubreddit] = [
+        IgnoredSubreddit.from_conf(**igs)
+        for igs in (config_data.get("ignored_subreddits") or [])
+    ]
+    if debug:
+        logger.debug("resolved ignored subreddits:\n%s", yaml.dump(ignored_subreddits))
+    links: typing.List[Link] = [
+        Link.from_conf(**ln) for ln in (config_data.get("links") or [])
+    ]
+    if debug:
+        logger.debug("resolved links:\n%s", yaml.dump(links))
 
     return ReddHarvestConfig(
         global_config,
@@ -1,18 +1,26 @@
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import functools
 import hashlib
-import io
+import logging
 import os
-import pprint
 import re
+import threading
 import typing
+import uuid
 
 import filetype
 import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 from urllib.parse import urlparse
+from urllib3.util.retry import Retry
 
-from redd_harvest.config import Link, SubSearch
+from redd_harvest.config import Link, LinkIndex, SubSearch
 from redd_harvest.post import Post
 
+logger = logging.getLogger(__name__)
+
 NEW_SAVED = "NEW_SAVED"
 ALREADY_SAVED = "ALREADY_SAVED"
 SEEN_NOT_SAVED = "SEEN_NOT_SAVED"
@@ -20,6 +28,56 @@ NOT_SAVED = "NOT_SAVED"
 IGNORED = "IGNORED"
 BONK = "BONK"
 
+# bytes read per iteration when streaming a download; throughput levels off
+# above ~100 KiB while per-chunk overhead grows quickly below it
+DOWNLOAD_CHUNK_SIZE = 131072  # 128 kibibytes
+# writes to a download's file are coalesced into syscalls of this size
+WRITE_BUFFER_SIZE = 1048576  # 1 mebibyte
+# leading bytes of a download kept for type sniffing; filetype never reads
+# past this many
+SNIFF_SIZE = 8192
+# concurrent downloads for posts with several urls (e.g. galleries)
+MAX_DOWNLOAD_WORKERS = 8
+# requests in flight at once across all posts when callers share fetch slots;
+# also the connection pool size per host, so pooled connections are reused
+MAX_CONCURRENT_FETCHES = 32
+
+# scheme, host, and (possibly bare) path; a cheap stand-in for urlparse
+_URI_RE = re.compile(r"^[a-zA-Z][a-zA-Z0-9+\-.]*://[^/?#\s]+/\S*")
+
+
+def build_session() -> requests.Session:
+    """A session that keeps connections to content hosts alive between
+    requests and retries failed connections with backoff.
+    """
+    session = requests.Session()
+    # pools are kept per host; size each for every allowed concurrent fetch
+    # going to the same host
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=MAX_CONCURRENT_FETCHES,
+        max_retries=Retry(total=3, backoff_factor=0.3),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# used by fetches that aren't given a session of their own
+_SESSION = build_session()
+
+
+def build_fetch_slots() -> threading.Semaphore:
+    """Slots shared by concurrent retrievals so no more than
+    MAX_CONCURRENT_FETCHES requests are in flight at once.
+    """
+    return threading.BoundedSemaphore(MAX_CONCURRENT_FETCHES)
+
+
+def close_session():
+    """Close pooled connections held by the shared session."""
+    _SESSION.close()
+
 
 class RetrievalStatus:
     def __init__(self, status, source_url, local_file, digest):
@@ -29,8 +87,12 @@ class RetrievalStatus:
         self.digest: str = digest
 
 
-def _uri_validator(x: str) -> bool:
-    """Is it a valid URI?"""
+def _uri_validator(x: str, strict: bool = False) -> bool:
+    """Is it a valid URI (has a scheme, host, and path)? The default check is a
+    quick pattern match; strict parses the URI fully.
+    """
+    if not strict:
+        return isinstance(x, str) and _URI_RE.match(x) is not None
     try:
         result = urlparse(x)
         return all([result.scheme, result.netloc, result.path])
@@ -38,33 +100,49 @@ def _uri_validator(x: str) -> bool:
         return False
 
 
-def _wget_data(url: str, progress_bar: tqdm) -> bytes:
-    """Get raw data from the specified url."""
-    data = bytes()
-    with requests.get(url, stream=True, timeout=(5, 8)) as r:
+def _wget_data(
+    url: str,
+    progress_bar: tqdm,
+    out: typing.BinaryIO,
+    session: typing.Optional[requests.Session] = None,
+    fetch_slots: typing.Optional[threading.Semaphore] = None,
+) -> typing.Tuple[str, bytes]:
+    """Stream raw data from the specified url into the given file, hashing it
+    along the way; returns the sha256 hex digest of the data and its leading
+    bytes (enough to sniff the file type).
+    """
+    digest = hashlib.sha256()
+    head = bytearray()
+    session = session or _SESSION
+    # the slot is held until the body has been read and the connection freed
+    slot = fetch_slots or contextlib.nullcontext()
+    with slot, session.get(url, stream=True, timeout=(5, 8)) as r:
         r.raise_for_status()
         total_size_bytes = int(r.headers.get("content-length", 0))
-        block_size = 16384  # 16 kibibytes
         progress_bar.total = total_size_bytes
-        progress_bar.refresh()
-        # figure out better way of handling for extremely large file case
-        with io.BytesIO() as buf:
-            for chunk in r.iter_content(chunk_size=block_size):
-                # If you have chunk encoded response uncomment if
-                # and set chunk_size parameter to None.
-                # if chunk:
-                progress_bar.update(len(chunk))
-                buf.write(chunk)
-            data = buf.getvalue()
-    return data
-
-
-def _wget_page(url: str) -> str:
+        for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            # If you have chunk encoded response uncomment if
+            # and set chunk_size parameter to None.
+            # if chunk:
+            progress_bar.update(len(chunk))
+            digest.update(chunk)
+            out.write(chunk)
+            if len(head) < SNIFF_SIZE:
+                head += chunk[: SNIFF_SIZE - len(head)]
+    return digest.hexdigest(), bytes(head)
+
+
+def _wget_page(
+    url: str,
+    session: typing.Optional[requests.Session] = None,
+    fetch_slots: typing.Optional[threading.Semaphore] = None,
+) -> str:
     """Get the page from the given url; if an exception occurs, this will fail
     and simply return an empty string.
     """
     data = ""
-    rsp = requests.get(url, timeout=(5, 8))
+    with fetch_slots or contextlib.nullcontext():
+        rsp = (session or _SESSION).get(url, timeout=(5, 8))
     rsp.raise_for_status()
     data = rsp.text
     return data
@@ -74,72 +152,56 @@ def get_url_from_page(page: str, subsearch: SubSearch) -> str:
     """Extract a url from from the given page with criteria specified in the
     given SubSearch.
     """
-    regex_str = rf"{subsearch.page_search_regex}"
-    if not is_valid_regex(regex_str, False):
-        print(f"- failed searching page contents: invalid regex: {regex_str}")
+    regex_str = subsearch.page_search_regex
+    if subsearch.page_search_pattern is None:
+        logger.warning(f"- failed searching page contents: invalid regex: {regex_str}")
         return ""
-    matches = re.findall(regex_str, page)
-    if matches is not None and len(matches) > 0:
-        # for debug... print(f'matched page contents: {pprint.pformat(matches)}')
-        for match in matches:
-            print(f"- validating matched page contents: {pprint.pformat(match)}")
-            if _uri_validator(match):  # make sure the match is a valid url
-                # return earliest match (some webpages will have duplicate matches)
-                return match.replace("&amp;", "&")
-            else:
-                print(f"- not a valid url: {match}")
-    else:  # consider leaving this for debug-only
-        print(f"- no matches w/ regex: '{regex_str}'")
+    pattern = subsearch.page_search_pattern
+    matched = False
+    # walk matches lazily; only as many as it takes to find a valid url
+    for m in pattern.finditer(page):
+        matched = True
+        # same shape as findall: whole match, sole group, or tuple of groups,
+        # with groups that didn't participate as empty strings
+        if pattern.groups == 0:
+            match = m.group(0)
+        elif pattern.groups == 1:
+            match = m.group(1) or ""
+        else:
+            match = m.groups(default="")
+        logger.debug(f"- validating matched page contents: {match!r}")
+        if _uri_validator(match):  # make sure the match is a valid url
+            # return earliest match (some webpages will have duplicate matches)
+            return match.replace("&amp;", "&")
+        else:
+            logger.info(f"- not a valid url: {match}")
+    if not matched:  # consider leaving this for debug-only
+        logger.info(f"- no matches w/ regex: '{regex_str}'")
         # for debug... print(page)
     return ""
 
 
-def is_valid_regex(regex_from_user: str, escape: bool) -> bool:
-    """Is it a valid regex? Can choose whether or not to escape."""
-    try:
-        if escape:
-            re.compile(re.escape(regex_from_user))
-        else:
-            re.compile(regex_from_user)
-        is_valid = True
-    except re.error:
-        is_valid = False
-    return is_valid
-
-
-def safe_matches_regex(regex_str: str, url: str) -> bool:
-    """Returns whether or not the given url matches the given regex string.  If
-    the regex string fails to compile, returns False.  If the given url cast to
-    lowercase matches the regex string, returns True, otherwise returns False.
-    """
-    lower_url = url.lower()
-    if not is_valid_regex(regex_str, False):
-        print(f"- failed checking '{url}' invalid regex: {regex_str}")
-        return False
-    elif re.search(regex_str, lower_url):
-        return True
-    return False
-
-
 def get_direct_download_url(url: str, link: Link) -> typing.List[str]:
     """If the given url matched the direct download criteria in the given link,
     a massaged url is returned.  Returns as a list just for consistency with
     similar functions.
     """
+    lower_url = url.lower()
     dl_urls: typing.List[str] = []
-    for ext in link.direct_dl_url_extensions:
-        if safe_matches_regex(f"^.+\\.{ext.lower()}$", url):
+    for ext in link.lower_extensions:
+        if lower_url.endswith(f".{ext}") and len(lower_url) > len(ext) + 1:
             dl_urls.append(url)  # easy match!
             continue
         # try to handle imgur-like _d thumbnail url w/ extra properties
-        if safe_matches_regex(f"^.+_d\\.{ext.lower()}\\?.*$", url):
-            d_index = url.index("_d")
-            new_url = f"{url[:d_index]}.{ext.lower()}"
+        d_index = lower_url.find(f"_d.{ext}?", 1)
+        if d_index != -1:
+            new_url = f"{url[:d_index]}.{ext}"
             dl_urls.append(new_url)
             continue
         # try to handle imgur-like url w/ just extra properties
-        if safe_matches_regex(f"^.+\\.{ext.lower()}\\?.*$", url):
-            prop_index = url.index("?")
+        ext_index = lower_url.find(f".{ext}?", 1)
+        if ext_index != -1:
+            prop_index = ext_index + len(ext) + 1
             new_url = url[:prop_index]
             dl_urls.append(new_url)
             continue
@@ -171,38 +233,50 @@ def get_urls_from_gallery(post: Post) -> typing.List[str]:
         try:
             dl_urls.extend(get_urls_from_media_metadata(post_raw))
         except (KeyError, AttributeError) as e:
-            print(f"- error getting gallery items from post at {url}: {e}")
+            logger.error(f"- error getting gallery items from post at {url}: {e}")
     elif post_raw.get("crosspost_parent", False):
-        print(f"- found a crosspost of '{post_raw.get('crosspost_parent')}''")
+        logger.info(f"- found a crosspost of '{post_raw.get('crosspost_parent')}''")
         try:
             for cross in post_raw.get("crosspost_parent_list", []):
                 if cross.get("is_gallery", False):
                     dl_urls.extend(get_urls_from_media_metadata(cross))
         except (KeyError, AttributeError) as e:
-            print(f"- error getting gallery items from (cross)post at {url}: {e}")
+            logger.error(
+                f"- error getting gallery items from (cross)post at {url}: {e}"
+            )
     return dl_urls
 
 
-def get_matching_urls_from_page(url: str, link: Link) -> typing.List[str]:
+def get_matching_urls_from_page(
+    url: str,
+    link: Link,
+    session: typing.Optional[requests.Session] = None,
+    fetch_slots: typing.Optional[threading.Semaphore] = None,
+) -> typing.List[str]:
     """Extract urls from the page the given url points to that match the
     criteria specified in the given link.
     """
     lower_url = url.lower()
     dl_urls: typing.List[str] = []
+    # sub searches that apply to the url (matching extension, if provided)
+    eligible = [
+        ss
+        for ss in link.sub_searches
+        if ss.lower_extension is None or lower_url.endswith(f".{ss.lower_extension}")
+    ]
+    if len(eligible) < 1:  # don't bother fetching a page nothing will search
+        return dl_urls
+    seen: typing.Set[str] = set()
     try:
-        page = _wget_page(url)
-        for ss in link.sub_searches:
-            dl_url: str = ""
-            if ss.extension is not None:  # match extension if provided
-                if re.search(f"^.*\\.{ss.extension.lower()}$", lower_url):
-                    dl_url = get_url_from_page(page, ss)
-            else:
-                dl_url = get_url_from_page(page, ss)
-            if dl_url != "" and dl_url not in dl_urls:  # append unique
+        page = _wget_page(url, session, fetch_slots)
+        for ss in eligible:
+            dl_url = get_url_from_page(page, ss)
+            if dl_url != "" and dl_url not in seen:  # append unique
+                seen.add(dl_url)
                 dl_urls.append(dl_url)
-        # for debug... else: print(f'\'{lower_url}\' didn\'t match \'{link.base_url.lower()}\'')
+        # for debug... else: print(f'\'{lower_url}\' didn\'t match \'{link.lower_base_url}\'')
     except Exception as e:
-        print(f"- error extracting urls from page at '{url}': {e}")
+        logger.error(f"- error extracting urls from page at '{url}': {e}")
     return dl_urls
 
 
@@ -227,38 +301,46 @@ def get_urls_from_reddit_video(post: Post) -> typing.List[str]:
         try:
             dl_urls.extend(get_urls_from_media_reddit_video(post_raw))
         except (KeyError, AttributeError) as e:
-            print(f"- error getting video from post at {url}: {e}")
+            logger.error(f"- error getting video from post at {url}: {e}")
     elif post_raw.get("crosspost_parent", False):
-        print(f"- found a crosspost of '{post_raw.get('crosspost_parent')}''")
+        logger.info(f"- found a crosspost of '{post_raw.get('crosspost_parent')}''")
         try:
             for cross in post_raw.get("crosspost_parent_list", []):
                 if post_raw.get("is_video", False):
                     dl_urls.extend(get_urls_from_media_reddit_video(cross))
         except (KeyError, AttributeError) as e:
-            print(f"- error getting video from (cross)post at {url}: {e}")
+            logger.error(f"- error getting video from (cross)post at {url}: {e}")
     return dl_urls
 
 
-def get_all_matching_urls(post: Post, links: typing.List[Link]) -> typing.List[str]:
+def get_all_matching_urls(
+    post: Post,
+    links: typing.Union[LinkIndex, typing.List[Link]],
+    session: typing.Optional[requests.Session] = None,
+    fetch_slots: typing.Optional[threading.Semaphore] = None,
+) -> typing.List[str]:
     """Get urls that point to desired content based on the the given Post and
-    the list of Links that define desired matches.
+    the list (or index) of Links that define desired matches.
     """
+    if not isinstance(links, LinkIndex):
+        links = LinkIndex(links)
     dl_urls: typing.List[str] = []
     # debug... print(pprint.pformat(post.post_raw))
-    for link in links:
+    for link in links.candidates(post.url.lower()):
         # a single url should only match one from link list, so return on first
         # match should be safe;
-        if post.url.lower().find(link.base_url.lower()) == 0:
-            dl_urls.extend(get_direct_download_url(post.url, link))
-            if len(dl_urls) > 0:  # early return for direct download urls if matched
-                return dl_urls
-            dl_urls.extend(get_urls_from_gallery(post))
-            if len(dl_urls) > 0:  # early return for gallery urls if matched
-                return dl_urls
-            dl_urls.extend(get_urls_from_reddit_video(post))
-            if len(dl_urls) > 0:  # early return for hosted reddit video if matched
-                return dl_urls
-            dl_urls.extend(get_matching_urls_from_page(post.url, link))
+        dl_urls.extend(get_direct_download_url(post.url, link))
+        if len(dl_urls) > 0:  # early return for direct download urls if matched
+            return dl_urls
+        dl_urls.extend(get_urls_from_gallery(post))
+        if len(dl_urls) > 0:  # early return for gallery urls if matched
+            return dl_urls
+        dl_urls.extend(get_urls_from_reddit_video(post))
+        if len(dl_urls) > 0:  # early return for hosted reddit video if matched
+            return dl_urls
+        dl_urls.extend(
+            get_matching_urls_from_page(post.url, link, session, fetch_slots)
+        )
     return dl_urls
 
 
@@ -274,10 +356,10 @@ def _filename_from_url(dl_url: str) -> str:
 
 
 def _dir_and_ext_by_type(
-    tmp_data: bytes, filename: str, sep_by_media: bool
+    head: bytes, filename: str, sep_by_media: bool
 ) -> typing.Tuple[str, str]:
-    """Given the file bytes and filename, determines a folder to sort media
-    into and determines an appropriate file extension."""
+    """Given the leading file bytes and filename, determines a folder to sort
+    media into and determines an appropriate file extension."""
     _, file_ext = os.path.splitext(filename)
     file_ext = file_ext.lower()
     if file_ext == ".jpeg":
@@ -285,79 +367,151 @@ def _dir_and_ext_by_type(
     media_dir = "."
     if sep_by_media:
         try:
-            data_kind = filetype.guess(tmp_data)
-            if filetype.is_image(tmp_data):
+            data_kind = filetype.guess(head)
+            if filetype.is_image(head):
                 media_dir = "images"
                 if data_kind is not None:
                     file_ext = f".{data_kind.extension}"
-            elif filetype.is_video(tmp_data):
+            elif filetype.is_video(head):
                 media_dir = "videos"
                 if data_kind is not None:
                     file_ext = f".{data_kind.extension}"
             else:
                 media_dir = "unknown"
         except Exception as e:
-            print(f"ERROR: exception raised while parsing filetype: {e}")
+            logger.error(f"ERROR: exception raised while parsing filetype: {e}")
             media_dir = "unknown"
     return media_dir, file_ext
 
 
+def _digest_saved(
+    dl_folder: str,
+    finalfile: str,
+    digest: str,
+    saved_digests: typing.Dict[str, typing.Set[str]],
+) -> bool:
+    """Whether a file named for the given digest already exists in the folder;
+    the extension of an existing file may differ from that of finalfile.
+    """
+    if os.path.exists(finalfile):
+        return True
+    if dl_folder not in saved_digests:
+        # file names without extensions, read once per folder
+        saved_digests[dl_folder] = {
+            file.partition(".")[0] for file in os.listdir(dl_folder)
+        }
+    return digest in saved_digests[dl_folder]
+
+
+def _retrieve_one(
+    sep_by_media: bool,
+    dl_root: str,
+    dl_subdir: str,
+    post: Post,
+    saved_digests: typing.Dict[str, typing.Set[str]],
+    ensured_dirs: typing.Set[str],
+    lock: threading.Lock,
+    dl_url: str,
+    session: typing.Optional[requests.Session] = None,
+    fetch_slots: typing.Optional[threading.Semaphore] = None,
+) -> RetrievalStatus:
+    """Download a single url from the given post and save it in the given
+    download folder, unless it has already been saved. Returns a status.
+    """
+    filename = _filename_from_url(dl_url)
+    # redraws are throttled by tqdm; close() draws the final state. No fixed
+    # position: bars from concurrent posts each take a free line
+    progress_bar = tqdm(
+        unit="iB",
+        unit_scale=True,
+        colour="#546975",
+        mininterval=0.2,
+    )
+    tmp_file = ""
+    try:
+        # stream to a partial file beside the final location, so it can be
+        # moved into place without another copy; created with the usual mode
+        # so saved files honor the user's umask
+        part_file = os.path.join(dl_root, f".{uuid.uuid4().hex}.part")
+        descriptor = os.open(part_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+        tmp_file = part_file
+        with open(descriptor, "wb", buffering=WRITE_BUFFER_SIZE) as tmp:
+            tmp_digest, head = _wget_data(
+                dl_url, progress_bar, tmp, session, fetch_slots
+            )
+        media_dir, file_ext = _dir_and_ext_by_type(head, filename, sep_by_media)
+        dl_folder = os.path.normpath(os.path.join(dl_root, media_dir, dl_subdir))
+        finalfile = os.path.join(dl_folder, f"{tmp_digest}{file_ext}")
+        # urls of the same post may resolve to the same content; check and
+        # save as one step
+        with lock:
+            if dl_folder not in ensured_dirs:
+                os.makedirs(dl_folder, 0o755, True)
+                ensured_dirs.add(dl_folder)
+            # if we already have at least one file with matching digest
+            if _digest_saved(dl_folder, finalfile, tmp_digest, saved_digests):
+                status = RetrievalStatus(ALREADY_SAVED, dl_url, finalfile, tmp_digest)
+            else:
+                os.replace(tmp_file, finalfile)
+                if dl_folder in saved_digests:
+                    saved_digests[dl_folder].add(tmp_digest)
+                status = RetrievalStatus(NEW_SAVED, dl_url, finalfile, tmp_digest)
+                progress_bar.colour = "#196593"
+        return status
+    except Exception as e:
+        logger.error(f"- error fetching content from {post.url}: {e}")
+        progress_bar.colour = "#9042f5"
+        return RetrievalStatus(NOT_SAVED, post.url, "", "")
+    finally:
+        progress_bar.close()
+        # left behind if already saved or the download failed
+        if tmp_file and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
 def retrieve_content(
     sep_by_media: bool,
     dl_root: str,
     dl_subdir: str,
     post: Post,
-    links: typing.List[Link],
+    links: typing.Union[LinkIndex, typing.List[Link]],
+    save_lock: typing.Optional[threading.Lock] = None,
+    session: typing.Optional[requests.Session] = None,
+    saved_digests: typing.Optional[typing.Dict[str, typing.Set[str]]] = None,
+    fetch_slots: typing.Optional[threading.Semaphore] = None,
 ) -> typing.List[RetrievalStatus]:
     """Attempt to retrieve content from the given post, based on the provided
     list of Links to define desired content, and save matches in the given
-    download folder. Returns a status.
+    download folder. Returns a status. Callers retrieving several posts at
+    once should share a save_lock and saved_digests (digests of saved files,
+    by folder) between them, and fetch_slots to bound the requests in flight
+    overall; fetches use the given session, or a shared module-level one if
+    not provided.
     """
     result: typing.List[RetrievalStatus] = []
     os.makedirs(dl_root, 0o755, True)
 
-    dl_urls = get_all_matching_urls(post, links)
+    dl_urls = get_all_matching_urls(post, links, session, fetch_slots)
     if dl_urls is not None and len(dl_urls) > 0:
-        for dl_url in dl_urls:
-            filename = _filename_from_url(dl_url)
-            progress_bar = tqdm(unit="iB", unit_scale=True, colour="#546975")
-            try:
-                tmp_data = _wget_data(dl_url, progress_bar)
-                tmp_digest = hashlib.sha256(tmp_data).hexdigest()
-                media_dir, file_ext = _dir_and_ext_by_type(
-                    tmp_data, filename, sep_by_media
-                )
-                dl_folder = os.path.normpath(
-                    os.sep.join([dl_root, media_dir, dl_subdir])
-                )
-                os.makedirs(dl_folder, 0o755, True)
-                finalfile = os.sep.join([dl_folder, f"{tmp_digest}{file_ext}"])
-                # if we already have at least one file with matching digest
-                if len(
-                    [
-                        file
-                        for file in os.listdir(dl_folder)
-                        if re.search(rf"{tmp_digest}", file)
-                    ]
-                ):
-                    result.append(
-                        RetrievalStatus(ALREADY_SAVED, dl_url, finalfile, tmp_digest)
-                    )
-                else:
-                    with open(finalfile, "wb") as out:
-                        out.write(tmp_data)
-                    result.append(
-                        RetrievalStatus(NEW_SAVED, dl_url, finalfile, tmp_digest)
-                    )
-                    progress_bar.colour = "#196593"
-                    progress_bar.refresh()
-                progress_bar.close()
-            except Exception as e:
-                print(f"- error fetching content from {post.url}: {e}")
-                result.append(RetrievalStatus(NOT_SAVED, post.url, "", ""))
-                progress_bar.colour = "#9042f5"
-                progress_bar.refresh()
-                progress_bar.close()
+        retrieve = functools.partial(
+            _retrieve_one,
+            sep_by_media,
+            dl_root,
+            dl_subdir,
+            post,
+            saved_digests if saved_digests is not None else {},
+            set(),  # folders already created during this call
+            save_lock if save_lock is not None else threading.Lock(),
+            session=session,
+            fetch_slots=fetch_slots,
+        )
+        if len(dl_urls) == 1:
+            result.append(retrieve(dl_urls[0]))
+        else:
+            # items of a gallery are independent network-bound downloads
+            workers = min(MAX_DOWNLOAD_WORKERS, len(dl_urls))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                result.extend(executor.map(retrieve, dl_urls))
     else:
         result.append(RetrievalStatus(NOT_SAVED, post.url, "", ""))
 
@@ -1,24 +1,63 @@
+from collections import Counter, OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime
 from importlib.resources import files as pkg_files
 
 # from importlib_resources import files # would need to install this for python < 3.10
+import json
+import logging
+from logging.handlers import QueueHandler, QueueListener
 import os
+import queue
+import shutil
 import signal
 from string import Template
 import sys
+import threading
 from threading import Event
+import time
 import traceback
+import typing
 
 import click
 import praw
+import requests
 
 from redd_harvest import fetch
-from redd_harvest.config import ReddHarvestConfig, gather_config
+from redd_harvest.config import EntityInterface, ReddHarvestConfig, gather_config
 from redd_harvest.post import Post
 from redd_harvest.version import __version__
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_CONFIG_FILE = os.sep.join(["~", ".config", "redd-harvest", "config.yml"])
 REDD_HARVEST_USER_AGENT_TEMPLATE = "python:$app:$ver (by /u/$username)"
+_USER_AGENT_TEMPLATE = Template(REDD_HARVEST_USER_AGENT_TEMPLATE)
+VALIDITY_CACHE_FILE = os.sep.join(["~", ".cache", "redd-harvest", "validity.json"])
+# most recent saved post urls remembered per run (crossposts, reposts)
+SAVED_URL_CACHE_SIZE = 4096
+
+
+def configure_logging(
+    debug: bool = False, queued: bool = True
+) -> typing.Optional[QueueListener]:
+    """Send package log messages to stdout, as plain messages. When queued,
+    records are handed to a listener thread so workers never block on output;
+    the returned listener should be stopped to flush remaining messages.
+    """
+    pkg_logger = logging.getLogger("redd_harvest")
+    pkg_logger.setLevel(logging.DEBUG if debug else logging.INFO)
+    pkg_logger.propagate = False
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    if not queued:
+        pkg_logger.addHandler(handler)
+        return None
+    log_queue = queue.SimpleQueue()
+    pkg_logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener
 
 
 def build_praw_client(redd_config: ReddHarvestConfig) -> praw.Reddit:
@@ -33,30 +72,87 @@ def build_praw_client(redd_config: ReddHarvestConfig) -> praw.Reddit:
 
     u = redd_config.globals.username
     p = redd_config.globals.password
-    ua = Template(REDD_HARVEST_USER_AGENT_TEMPLATE).substitute(
+    ua = _USER_AGENT_TEMPLATE.substitute(
         app=redd_config.globals.app,
         ver=__version__,
         username=u,
     )
-    print(f"constructed user-agent: '{ua}'")
-    if p is None or len(p) < 1:
-        print("password not defined, continuing with unauthenticated client...")
-        return praw.Reddit(
-            client_id=cid,
-            client_secret=cs,
-            user_agent=ua,
-            ratelimit_seconds=redd_config.globals.rate_limit_max_wait,
-        )
-
-    print("continuing with fully authenticated client...")
-    return praw.Reddit(
+    logger.info(f"constructed user-agent: '{ua}'")
+    client_kwargs = dict(
         client_id=cid,
         client_secret=cs,
-        username=u,
-        password=p,
         user_agent=ua,
         ratelimit_seconds=redd_config.globals.rate_limit_max_wait,
     )
+    if p is None or len(p) < 1:
+        logger.info("password not defined, continuing with unauthenticated client...")
+    else:
+        logger.info("continuing with fully authenticated client...")
+        client_kwargs.update(username=u, password=p)
+    return praw.Reddit(**client_kwargs)
+
+
+def _validity_key(entity: EntityInterface) -> str:
+    """Key of an entity in the validity cache; a redditor and a subreddit may
+    share a name.
+    """
+    kind = "redditor" if entity.is_redditor() else "subreddit"
+    return f"{kind}:{entity.get_name()}"
+
+
+def load_validity_stamps(cache_file: str) -> typing.Dict[str, float]:
+    """Load the times entities were last validated; empty if the cache is
+    missing or unreadable.
+    """
+    try:
+        with open(cache_file, "r") as f:
+            stamps = json.load(f)
+        if isinstance(stamps, dict):
+            return stamps
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def save_validity_stamps(cache_file: str, stamps: typing.Dict[str, float]):
+    """Write the times entities were last validated, replacing the cache file
+    in one step so a partial write is never read back.
+    """
+    try:
+        os.makedirs(os.path.dirname(cache_file), 0o700, True)
+        tmp_file = f"{cache_file}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(stamps, f)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.warning(f"- unable to save validity cache '{cache_file}': {e}")
+
+
+def _keep(
+    entity: EntityInterface,
+    subreddits_only: bool,
+    redditors_only: bool,
+    only_name: str,
+) -> bool:
+    """Whether the entity should be harvested given the command line filters;
+    logs the reason when it's skipped.
+    """
+    if entity.is_redditor() and subreddits_only:
+        logger.info(
+            f"- configured to skip redditors; skipping '{entity.get_name()}'..."
+        )
+        return False
+    if entity.is_subreddit() and redditors_only:
+        logger.info(
+            f"- configured to skip subreddits; skipping '{entity.get_name()}'..."
+        )
+        return False
+    if only_name and entity.get_name() != only_name:
+        logger.info(
+            f"- configured to only retrieve from '{only_name}'; skipping '{entity.get_name()}'..."
+        )
+        return False
+    return True
 
 
 class Harvester:
@@ -65,6 +161,19 @@ class Harvester:
         self.interactive: bool = interactive
         self.orig_sigint = signal.getsignal(signal.SIGINT)
         self.sleepy: Event = Event()
+        # reused for all content fetches so connections to hosts stay open
+        self.session: requests.Session = fetch.build_session()
+        # bounds requests in flight across concurrent posts and their galleries
+        self.fetch_slots: threading.Semaphore = fetch.build_fetch_slots()
+        # (url, download folder) -> statuses of a post whose content was saved
+        self.saved_urls: typing.OrderedDict[
+            typing.Tuple[str, str], typing.List[fetch.RetrievalStatus]
+        ] = OrderedDict()
+        # (url, download folder) -> set once the post retrieving it finishes
+        self.inflight_urls: typing.Dict[typing.Tuple[str, str], Event] = {}
+        self.saved_urls_lock = threading.Lock()
+        # validity cache key -> epoch seconds of the last successful validation
+        self.validity_stamps: typing.Dict[str, float] = {}
         signal.signal(signal.SIGINT, self.interrupt)
 
     def interrupt(self, signum, frame):
@@ -116,125 +225,271 @@ class Harvester:
                 if res.lower().startswith("y"):
                     redd_config.prune_ignorables()
                 else:
-                    print("not an affirmative response, pruning will be skipped...")
+                    logger.info(
+                        "not an affirmative response, pruning will be skipped..."
+                    )
+
+        cache_file = os.path.expanduser(VALIDITY_CACHE_FILE)
+        if redd_config.globals.validity_ttl > 0:
+            self.validity_stamps = load_validity_stamps(cache_file)
+        executor = ThreadPoolExecutor(max_workers=redd_config.globals.post_workers)
+        try:
+            return self._harvest_entities(
+                reddit,
+                redd_config,
+                executor,
+                subreddits_only,
+                redditors_only,
+                only_name,
+            )
+        finally:
+            # drop retrievals that haven't started if we're quitting early
+            executor.shutdown(cancel_futures=True)
+            self.session.close()
+            if redd_config.globals.validity_ttl > 0:
+                save_validity_stamps(cache_file, self.validity_stamps)
 
-        post_stats = []
+    def _harvest_entities(
+        self,
+        reddit: praw.Reddit,
+        redd_config: ReddHarvestConfig,
+        executor: ThreadPoolExecutor,
+        subreddits_only: bool,
+        redditors_only: bool,
+        only_name: str,
+    ) -> int:
+        """Harvest posts from each configured entity in turn, retrieving the
+        content of an entity's posts concurrently on the given executor.
+        """
+        save_lock = threading.Lock()
+        # digests of files in each download folder, shared across posts and
+        # only touched under save_lock
+        saved_digests: typing.Dict[str, typing.Set[str]] = {}
+        # running totals only; each status is printed as it completes
+        status_counts: typing.Counter[str] = Counter()
         entity_count = 0
-        for entity in redd_config.get_entities():
+        entities = (
+            e
+            for e in redd_config.get_entities()
+            if _keep(e, subreddits_only, redditors_only, only_name)
+        )
+        for entity in entities:
             if self.is_interrupted():
-                print("- interrupted, quitting early...")
+                logger.info("- interrupted, quitting early...")
                 break
-            if entity.is_redditor() and subreddits_only:
-                print(
-                    f"- configured to skip redditors; skipping '{entity.get_name()}'..."
-                )
-                continue
-            if entity.is_subreddit() and redditors_only:
-                print(
-                    f"- configured to skip subreddits; skipping '{entity.get_name()}'..."
-                )
-                continue
-            if (
-                only_name is not None
-                and len(only_name) > 0
-                and entity.get_name() != only_name
-            ):
-                print(
-                    f"- configured to only retrieve from '{only_name}'; skipping '{entity.get_name()}'..."
-                )
-                continue
-
             # skip backoff sleep if retrieval hasn't been attempted yet
             if entity_count > 0:
-                remaining = reddit.auth.limits.get("remaining", 0)
-                used = reddit.auth.limits.get("used", 0)
-                ts = reddit.auth.limits.get("reset_timestamp", 0)
-                tsf = 0.0
-                if ts is not None:
-                    try:
-                        tsf = float(ts)
-                    except Exception as _:
-                        tsf = 0.0
-                reset_timestamp = datetime.fromtimestamp(tsf)
-                print(
-                    f"--- current rate limits: remaining - {remaining}, used - {used}, reset_timestamp = '{reset_timestamp}'"
-                )
-                print(
+                # only reported; skip reading limits when nothing is logged
+                if logger.isEnabledFor(logging.INFO):
+                    limits = reddit.auth.limits  # built anew on each access
+                    remaining = limits.get("remaining", 0)
+                    used = limits.get("used", 0)
+                    ts = limits.get("reset_timestamp", 0)
+                    tsf = 0.0
+                    if ts is not None:
+                        try:
+                            tsf = float(ts)
+                        except Exception as _:
+                            tsf = 0.0
+                    reset_timestamp = datetime.fromtimestamp(tsf)
+                    logger.info(
+                        f"--- current rate limits: remaining - {remaining}, used - {used}, reset_timestamp = '{reset_timestamp}'"
+                    )
+                logger.info(
                     f"--- sleeping for {redd_config.globals.backoff_sleep}s before next batch"
                 )
                 self.sleep(timeout=redd_config.globals.backoff_sleep)
-            print()
+            logger.info("")
             entity_count += 1
             if self.is_interrupted():
-                print("- interrupted, quitting early...")
+                logger.info("- interrupted, quitting early...")
                 break
             try:
-                entity.validate(reddit)
-                if not entity.is_valid():
-                    print(
-                        f"- trouble fetching submissions from '{entity.get_name()}'; continuing..."
+                if self.recently_validated(entity, redd_config.globals.validity_ttl):
+                    logger.info(
+                        f"- '{entity.get_name()}' was validated recently; skipping validation..."
                     )
-                    continue
+                    entity.valid = True
+                else:
+                    entity.validate(reddit)
+                    if not entity.is_valid():
+                        logger.warning(
+                            f"- trouble fetching submissions from '{entity.get_name()}'; continuing..."
+                        )
+                        continue
+                    self.validity_stamps[_validity_key(entity)] = time.time()
             except BaseException as err:
-                print(
+                logger.error(
                     f"- exception occured while fetching submissions from '{entity.get_name()}': {err}\n"
                 )
                 continue
 
             count = 0
-            for submission in entity.get_submissions(reddit):
-                if self.is_interrupted():
-                    print("- interrupted, quitting early...")
-                    break
-                post = Post(submission)
-                print(
-                    f"- processing post {count} w/ id '{post.id}' from {post.author} in {post.subreddit_name} w/ url {post.url}"
-                )
-                retrieval_status = [
-                    fetch.RetrievalStatus(fetch.IGNORED, post.url, "", "")
-                ]
-                if not redd_config.should_ignore_post(post):
-                    if post.over_18 and not redd_config.globals.bonk:
-                        retrieval_status = [
-                            fetch.RetrievalStatus(fetch.BONK, post.url, "", "")
-                        ]
+            pending = set()
+            workers = redd_config.globals.post_workers
+            listing_error = None
+            # praw listings and lazy attributes are read on this thread; only
+            # content retrieval for each post is handed to the pool
+            try:
+                for submission in entity.get_submissions(reddit):
+                    if self.is_interrupted():
+                        logger.info("- interrupted, quitting early...")
+                        break
+                    post = Post(submission)
+                    logger.info(
+                        "- processing post %d w/ id '%s' from %s in %s w/ url %s",
+                        count,
+                        post.id,
+                        post.author,
+                        post.subreddit_name,
+                        post.url,
+                    )
+                    # posts that won't be retrieved never go to the pool
+                    skip_status = self.skip_status(redd_config, post)
+                    if skip_status is not None:
+                        self._report([skip_status], status_counts)
                     else:
-                        root_folder = redd_config.get_download_root()
-                        sub_folder = redd_config.get_download_sub_folder(entity, post)
-                        retrieval_status = fetch.retrieve_content(
-                            redd_config.separate_media(),
-                            f"{root_folder}",
-                            f"{sub_folder}",
-                            post,
-                            redd_config.links,
+                        pending.add(
+                            executor.submit(
+                                self.retrieve_post,
+                                redd_config,
+                                entity,
+                                post,
+                                save_lock,
+                                saved_digests,
+                            )
                         )
-                for dl_status in retrieval_status:
-                    print(
-                        f"-- status: {dl_status.status}; source_url: {dl_status.source_url}"
-                    )
-                    # not sure tracking post stats is interesting anymore
-                    post_stats.append(
-                        [
-                            post.title,
-                            post.author,
-                            post.subreddit_name,
-                            post.url,
-                            post.selftext,
-                            post.created,
-                            dl_status.status,
-                            dl_status.source_url,
-                            dl_status.local_file,
-                            dl_status.digest,
-                        ]
-                    )
-                count += 1
-                # manually check to handle searches that do not accept limits (i.e. stream)
-                if count >= entity.get_search_criteria().post_limit:
-                    break
-            print(f"--- processed {count} posts from '{entity.get_name()}'")
+                        # report whatever has finished; once every worker is busy,
+                        # wait for one to free up before reading more posts
+                        done, pending = wait(
+                            pending,
+                            timeout=None if len(pending) >= workers else 0,
+                            return_when=FIRST_COMPLETED,
+                        )
+                        for future in done:
+                            self._report(future.result(), status_counts)
+                    count += 1
+                    # manually check to handle searches that do not accept limits (i.e. stream)
+                    if count >= entity.get_search_criteria().post_limit:
+                        break
+            except Exception as err:
+                # e.g. banned or suspended since it was last validated
+                listing_error = err
+            for future in as_completed(pending):
+                self._report(future.result(), status_counts)
+            if listing_error is not None:
+                logger.error(
+                    f"- exception occured while fetching submissions from '{entity.get_name()}': {listing_error}\n"
+                )
+                # don't trust a remembered validation for it on the next run
+                entity.valid = False
+                self.validity_stamps.pop(_validity_key(entity), None)
+                continue
+            logger.info(f"--- processed {count} posts from '{entity.get_name()}'")
 
+        summary = ", ".join(f"{k} - {v}" for k, v in sorted(status_counts.items()))
+        logger.info(f"--- retrieval totals: {summary if summary else 'none'}")
         return 0
 
+    def _report(
+        self,
+        statuses: typing.List[fetch.RetrievalStatus],
+        status_counts: typing.Counter[str],
+    ):
+        """Log the statuses of a post and add them to the running totals."""
+        for dl_status in statuses:
+            logger.info(
+                "-- status: %s; source_url: %s",
+                dl_status.status,
+                dl_status.source_url,
+            )
+            status_counts[dl_status.status] += 1
+
+    def recently_validated(self, entity: EntityInterface, ttl: float) -> bool:
+        """Whether the entity was successfully validated within the last ttl
+        seconds; always false when ttl is 0.
+        """
+        if ttl <= 0:
+            return False
+        stamp = self.validity_stamps.get(_validity_key(entity))
+        return isinstance(stamp, (int, float)) and time.time() - stamp < ttl
+
+    def skip_status(
+        self, redd_config: ReddHarvestConfig, post: Post
+    ) -> typing.Optional[fetch.RetrievalStatus]:
+        """The status of a post whose content shouldn't be retrieved, because
+        it's ignored or nsfw (unless bonk is enabled); None otherwise.
+        """
+        if redd_config.should_ignore_post(post):
+            return fetch.RetrievalStatus(fetch.IGNORED, post.url, "", "")
+        if post.over_18 and not redd_config.globals.bonk:
+            return fetch.RetrievalStatus(fetch.BONK, post.url, "", "")
+        return None
+
+    def retrieve_post(
+        self,
+        redd_config: ReddHarvestConfig,
+        entity: EntityInterface,
+        post: Post,
+        save_lock: threading.Lock,
+        saved_digests: typing.Dict[str, typing.Set[str]],
+    ) -> typing.List[fetch.RetrievalStatus]:
+        """Retrieve content from a single post that has passed skip_status;
+        safe to call from worker threads.
+        """
+        if self.is_interrupted():
+            return []
+        root_folder = redd_config.get_download_root()
+        sub_folder = redd_config.get_download_sub_folder(entity, post)
+        key = (post.url, os.path.join(root_folder, sub_folder))
+        while True:
+            with self.saved_urls_lock:
+                saved = self.saved_urls.get(key)
+                inflight = None
+                if saved is not None:
+                    self.saved_urls.move_to_end(key)
+                elif key in self.inflight_urls:
+                    inflight = self.inflight_urls[key]
+                else:  # claim the url for this post
+                    self.inflight_urls[key] = Event()
+            if saved is not None:  # same url already saved to the same place
+                return [
+                    fetch.RetrievalStatus(
+                        fetch.ALREADY_SAVED, s.source_url, s.local_file, s.digest
+                    )
+                    for s in saved
+                ]
+            if inflight is None:
+                break
+            # another post is retrieving the same url; use its result, or
+            # retry if it didn't save everything
+            inflight.wait()
+        result: typing.List[fetch.RetrievalStatus] = []
+        try:
+            result = fetch.retrieve_content(
+                redd_config.separate_media(),
+                f"{root_folder}",
+                f"{sub_folder}",
+                post,
+                redd_config.link_index,
+                save_lock,
+                self.session,
+                saved_digests,
+                self.fetch_slots,
+            )
+        finally:
+            # only remember complete saves, so failures are retried
+            complete = len(result) > 0 and all(
+                s.status in (fetch.NEW_SAVED, fetch.ALREADY_SAVED) for s in result
+            )
+            with self.saved_urls_lock:
+                if complete:
+                    self.saved_urls[key] = result
+                    if len(self.saved_urls) > SAVED_URL_CACHE_SIZE:
+                        self.saved_urls.popitem(last=False)
+                self.inflight_urls.pop(key).set()
+        return result
+
 
 @click.command(name="setup")
 def bootstrap_config() -> int:
@@ -244,12 +499,16 @@ def bootstrap_config() -> int:
         print(f"config '{config_file}' already exists, no action taken...")
         return 1
     os.makedirs(os.path.dirname(config_file), 0o700, True)
-    data = pkg_files("redd_harvest.data").joinpath("example.yml").read_bytes()
-    descriptor = os.open(
-        path=config_file, flags=(os.O_WRONLY | os.O_CREAT | os.O_TRUNC), mode=0o600
-    )
-    with open(descriptor, "wb") as out:
-        out.write(data)
+    example = pkg_files("redd_harvest.data").joinpath("example.yml")
+    # open the packaged example first, so a failure leaves no empty config
+    with example.open("rb") as src:
+        descriptor = os.open(
+            path=config_file,
+            flags=(os.O_WRONLY | os.O_CREAT | os.O_TRUNC),
+            mode=0o600,
+        )
+        with open(descriptor, "wb") as out:
+            shutil.copyfileobj(src, out)
     print(f"wrote example configuration to '{config_file}', check it out!")
     return 0
 
@@ -287,29 +546,41 @@ def bootstrap_config() -> int:
     is_flag=True,
     help="Elevates a few interactive prompts when certain events occur.",
 )
+@click.option(
+    "-d",
+    "--debug",
+    is_flag=True,
+    help="Enable debug logging.",
+)
 def run(
     config: str,
     subreddits_only: bool,
     redditors_only: bool,
     only_name: str,
     interactive: bool,
+    debug: bool,
 ) -> int:
     """Run the harvester."""
-    # TODO: accept --debug flag for debug logging; better logging in general
-
-    print(f"using config file: {config}")
-    redd_config = gather_config(config)
-    rc = 0
+    # prompts are written directly, so interactive runs log synchronously to
+    # keep messages ordered with them
+    listener = configure_logging(debug, queued=not interactive)
     try:
-        reddit = build_praw_client(redd_config)
-        harvester = Harvester(interactive)
-        rc = harvester.harvest(
-            reddit, redd_config, subreddits_only, redditors_only, only_name
-        )
-    except Exception as _:
-        traceback.print_exc()
-        rc = 1
-    return rc
+        logger.info(f"using config file: {config}")
+        redd_config = gather_config(config)
+        rc = 0
+        try:
+            reddit = build_praw_client(redd_config)
+            harvester = Harvester(interactive)
+            rc = harvester.harvest(
+                reddit, redd_config, subreddits_only, redditors_only, only_name
+            )
+        except Exception as _:
+            traceback.print_exc()
+            rc = 1
+        return rc
+    finally:
+        if listener is not None:
+            listener.stop()
 
 
 @click.group(name="redd-harvest")
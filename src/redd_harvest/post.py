@@ -1,23 +1,58 @@
 from datetime import datetime
+import logging
 import typing
 
 import praw
 
+logger = logging.getLogger(__name__)
+
+
+def _author_name(submission: praw.reddit.models.Submission) -> str:
+    """Name of the submission's author; 'unknown' if it can't be determined
+    (e.g. deleted accounts).
+    """
+    try:
+        author = submission.author
+        if author is not None and author.name is not None:
+            return author.name.strip()
+    except:
+        logger.warning(
+            "...massive trouble getting post author info... continuing anyways"
+        )
+    return "unknown"
+
 
 class Post:
+    # one is created per submission; no per-instance __dict__
+    __slots__ = (
+        "submission",
+        "id",
+        "title",
+        "author",
+        "subreddit_name",
+        "url",
+        "selftext",
+        "created_utc",
+        "over_18",
+    )
+
     def __init__(self, submission: praw.reddit.models.Submission):
         self.submission: praw.reddit.models.Submission = submission
         self.id: str = submission.id
         self.title: str = submission.title
-        self.author: str = "unknown"
-        try:
-            if submission.author is not None and submission.author.name is not None:
-                self.author: str = submission.author.name.strip()
-        except:
-            print("...massive trouble getting post author info... continuing anyways")
+        self.author: str = _author_name(submission)
         self.subreddit_name: str = submission.subreddit.display_name.strip()
         self.url: str = submission.url.strip()
         self.selftext: str = submission.selftext
-        self.created: datetime = datetime.fromtimestamp(submission.created_utc)
+        self.created_utc: float = submission.created_utc
         self.over_18: bool = submission.over_18
-        self.post_raw: typing.Dict[str, typing.Any] = vars(submission)
+
+    @property
+    def created(self) -> datetime:
+        """Local time the post was created, converted on access."""
+        return datetime.fromtimestamp(self.created_utc)
+
+    @property
+    def post_raw(self) -> typing.Dict[str, typing.Any]:
+        """Attributes of the underlying submission, read on access."""
+        return vars(self.submission)